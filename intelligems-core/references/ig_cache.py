@@ -0,0 +1,85 @@
+"""
+Intelligems Analytics — Response Cache
+
+Short-lived on-disk cache for API responses. Re-running a skill on the
+same test (e.g. while iterating on Slack wording) reads the previous
+response from disk instead of making another round-trip.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Tuple, Union
+
+from ig_config import CACHE_DIR, CACHE_TTL, ENDED_CACHE_TTL
+
+
+def _cache_path(key: Tuple, api_key: str) -> str:
+    """Map a cache key like ("overview", test_id) to a file path.
+
+    The API key is part of the digest, so each store gets its own entries.
+    """
+    digest = hashlib.sha1(json.dumps([api_key, key]).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def cache_ttl(experiment: dict, active_ttl: int = CACHE_TTL) -> int:
+    """Cache lifetime for a test's responses — ended tests no longer change."""
+    if experiment.get("endedAtTs") or experiment.get("endedAt"):
+        return ENDED_CACHE_TTL
+    return active_ttl
+
+
+def cached_call(
+    key: Tuple,
+    ttl_seconds: Union[float, Callable[[Any], float]],
+    fn: Callable[[], Any],
+    api_key: str,
+    enabled: bool = True,
+    log: Callable[[str], Any] = print,
+) -> Any:
+    """Return fn(), reusing a cached result younger than ttl_seconds.
+
+    Args:
+        key: JSON-serializable tuple identifying the call, e.g. ("detail", test_id)
+        ttl_seconds: Maximum age of a cached response, or a function of the
+            cached response returning one (e.g. longer for ended tests)
+        fn: Zero-argument callable that performs the real API request
+        api_key: Key the request is made with; entries are never shared
+            between keys
+        enabled: Pass False (--no-cache) to always fetch fresh data
+        log: Receives the hit/miss lines (e.g. a list's append, to print
+            them later from the main thread)
+
+    Empty responses are never written, so a failed fetch is retried next run.
+    """
+    if not enabled:
+        return fn()
+
+    label = "/".join(str(k) for k in key)
+    path = _cache_path(key, api_key)
+    try:
+        age = time.time() - os.path.getmtime(path)
+        if callable(ttl_seconds) or age < ttl_seconds:
+            with open(path) as f:
+                data = json.load(f)
+            ttl = ttl_seconds(data) if callable(ttl_seconds) else ttl_seconds
+            if age < ttl:
+                log(f"  Cache hit: {label}")
+                return data
+    except (OSError, ValueError):
+        pass
+
+    log(f"  Cache miss: {label}")
+    data = fn()
+    if data:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log(f"  Warning: Could not write cache for {label}: {e}")
+    return data
@@ -5,11 +5,15 @@ Handles all communication with the Intelligems External API.
 Includes automatic retry with exponential backoff for rate limits.
 """
 
+import threading
 import time
 import requests
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from ig_config import (
-    API_BASE, REQUEST_DELAY, MAX_RETRIES, RETRY_BASE_DELAY
+    API_BASE, REQUEST_DELAY, MAX_RETRIES, RETRY_BASE_DELAY, REQUEST_TIMEOUT,
+    MAX_WORKERS,
 )
 
 
@@ -23,20 +27,40 @@ class IntelligemsAPI:
             "Content-Type": "application/json",
         }
         self._last_request_time = 0
+        self._throttle_lock = threading.Lock()
+
+        # Persistent session so every call (including concurrent fetches)
+        # reuses pooled keep-alive connections instead of a new TLS
+        # handshake per request. Sized for MAX_WORKERS threads.
+        self._session = requests.Session()
+        self._session.mount(
+            "https://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+        )
+        self._session.headers.update(self.headers)
+        self._session.headers.update({
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip",
+        })
 
     def _throttle(self):
-        """Enforce minimum delay between requests."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < REQUEST_DELAY:
-            time.sleep(REQUEST_DELAY - elapsed)
-        self._last_request_time = time.time()
+        """Enforce minimum delay between requests.
+
+        Thread-safe: concurrent callers each reserve the next start slot,
+        so requests begin REQUEST_DELAY apart while their round-trips overlap.
+        """
+        with self._throttle_lock:
+            now = time.time()
+            start = max(now, self._last_request_time + REQUEST_DELAY)
+            self._last_request_time = start
+        if start > now:
+            time.sleep(start - now)
 
     def _request(self, url: str, params: Optional[Dict] = None) -> Dict:
         """Make a GET request with retry logic for rate limits."""
         for attempt in range(MAX_RETRIES):
             self._throttle()
             try:
-                response = requests.get(url, headers=self.headers, params=params)
+                response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
                 return response.json()
             except requests.HTTPError as e:
@@ -92,6 +116,36 @@ class IntelligemsAPI:
             params={"view": "overview"},
         )
 
+    def iter_overview_analytics(
+        self, experience_ids: List[str]
+    ) -> Iterator[Tuple[int, Union[Dict, Exception]]]:
+        """Fetch overview analytics for many experiences, yielding as each lands.
+
+        The External API has no multi-experience endpoint, so this issues the
+        per-experience requests concurrently (MAX_WORKERS at a time, still
+        throttled) over the pooled session.
+
+        Yields:
+            (index, analytics) pairs in completion order, where index is the
+            position in experience_ids, so repeated or blank ids each get
+            their own result. A failed fetch yields the exception it raised
+            in place of the analytics.
+        """
+        executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        try:
+            futures = {
+                executor.submit(self.get_overview_analytics, exp_id): i
+                for i, exp_id in enumerate(experience_ids)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            # Don't wait out queued fetches if the caller stops early (Ctrl-C)
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def get_segment_analytics(
         self, experience_id: str, segment_type: str
     ) -> Dict:
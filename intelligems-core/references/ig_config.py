@@ -5,6 +5,8 @@ Thresholds and constants used across all skills.
 Intelligems philosophy: 80% confidence is enough. We're not making cancer medicine.
 """
 
+import os
+
 # API
 API_BASE = "https://api.intelligems.io/v25-10-beta"
 
@@ -17,6 +19,7 @@ NEUTRAL_LIFT_THRESHOLD = 0.02  # ±2% lift = effectively flat
 MIN_RUNTIME_DAYS = 10
 MIN_VISITORS = 100
 MIN_ORDERS = 10
+MS_PER_DAY = 86_400_000        # API timestamps are epoch milliseconds
 
 # Verdict thresholds
 VERDICT_MIN_RUNTIME = 10       # Days before issuing a verdict
@@ -26,6 +29,14 @@ VERDICT_MIN_ORDERS = 30        # Orders before a verdict is credible
 REQUEST_DELAY = 1.0            # Seconds between requests
 MAX_RETRIES = 5
 RETRY_BASE_DELAY = 5           # Seconds, doubles each retry
+REQUEST_TIMEOUT = (3, 30)      # Seconds — (connect, read)
+MAX_WORKERS = 8                # Concurrent API requests (thread + connection pool size)
+
+# Response cache (disable per run with --no-cache)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "intelligems")
+CACHE_TTL = 300                # Seconds — experiment detail + overview
+SEGMENT_CACHE_TTL = 60         # Seconds — segment data, kept fresher
+ENDED_CACHE_TTL = 3600         # Seconds — debriefs / ended tests change rarely
 
 # Segments available in the API
 SEGMENT_TYPES = [
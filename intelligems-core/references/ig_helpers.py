@@ -4,8 +4,10 @@ Intelligems Analytics — Utility Helpers
 Formatting, variation lookup, runtime calculation, and presentation helpers.
 """
 
-from datetime import datetime
-from typing import Optional, Dict, List
+import time
+from typing import Optional, Dict, List, Tuple
+
+from ig_config import MS_PER_DAY
 
 
 # ── Variation helpers ─────────────────────────────────────────────────
@@ -40,18 +42,22 @@ def runtime_days(started_ts: Optional[float]) -> int:
     """
     if not started_ts:
         return 0
-    start = datetime.fromtimestamp(started_ts / 1000)
-    return max((datetime.now() - start).days, 0)
+    return max(int((time.time() * 1000 - started_ts) // MS_PER_DAY), 0)
 
 
 def runtime_display(started_ts: Optional[float]) -> str:
     """Human-readable runtime string."""
+    return runtime_info(started_ts)[1]
+
+
+def runtime_info(started_ts: Optional[float]) -> Tuple[int, str]:
+    """Runtime days and display string from a single timestamp parse."""
     days = runtime_days(started_ts)
     if days == 0:
-        return "< 1 day"
+        return days, "< 1 day"
     if days == 1:
-        return "1 day"
-    return f"{days} days"
+        return days, "1 day"
+    return days, f"{days} days"
 
 
 # ── Formatting ────────────────────────────────────────────────────────
@@ -5,7 +5,7 @@ Functions to pull values, uplift, confidence, and CI bounds
 from the Intelligems analytics response structure.
 """
 
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, Iterable, List, Tuple
 
 
 # ── Single-metric extraction ─────────────────────────────────────────
@@ -65,6 +65,53 @@ def get_metric_ci(
     return None, None
 
 
+# ── Indexed lookup ───────────────────────────────────────────────────
+
+MetricIndex = Dict[Tuple[str, str], Dict[str, Optional[float]]]
+
+
+def build_metric_index(
+    metrics: List[Dict], names: Optional[Iterable[str]] = None
+) -> MetricIndex:
+    """Index every metric in one pass, keyed by (metric_name, variation_id).
+
+    Each entry holds value, uplift, confidence (p2bb), ci_low and ci_high,
+    so repeated lookups are O(1) instead of rescanning the metrics list.
+    Like the get_metric_* helpers, the first row for a variation wins.
+    Pass names to index only those metrics.
+    """
+    wanted = set(names) if names is not None else None
+    index = {}
+    seen = set()
+    for m in metrics:
+        vid = m.get("variation_id")
+        if vid in seen:
+            continue
+        seen.add(vid)
+        for name, data in m.items():
+            if not isinstance(data, dict) or (wanted is not None and name not in wanted):
+                continue
+            uplift = data.get("uplift", {})
+            if not isinstance(uplift, dict):
+                uplift = {}
+            index[(name, vid)] = {
+                "value": data.get("value"),
+                "uplift": uplift.get("value"),
+                "confidence": data.get("p2bb"),
+                "ci_low": uplift.get("ci_low"),
+                "ci_high": uplift.get("ci_high"),
+            }
+    return index
+
+
+def lookup_metric(
+    index: MetricIndex, metric_name: str, variation_id: str, field: str
+) -> Optional[float]:
+    """Read one field ('value', 'uplift', 'confidence', ...) from a metric index."""
+    entry = index.get((metric_name, variation_id))
+    return entry[field] if entry else None
+
+
 # ── Aggregate helpers ─────────────────────────────────────────────────
 
 def get_total_visitors(metrics: List[Dict]) -> int:
@@ -10,7 +10,30 @@ instead of printing to terminal.
 
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional
+from urllib3.util.retry import Retry
+
+# Reused across sends so repeat deliveries keep the TLS connection alive.
+# Rate limits and transient 5xx are retried on the pooled connection
+# (honoring Retry-After) before send_to_slack reports a failure. A webhook
+# POST is not idempotent, so read errors and timeouts are never retried —
+# Slack may already have posted the message.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=2,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=0,
+        other=0,
+        backoff_factor=0.25,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+))
 
 
 # ── Block builders ────────────────────────────────────────────────────
@@ -84,7 +107,11 @@ def verdict_emoji(verdict: str) -> str:
 # ── Send to Slack ─────────────────────────────────────────────────────
 
 def send_to_slack(webhook_url: str, blocks: List[Dict], text: str = "Intelligems Analytics") -> bool:
-    """POST blocks to a Slack webhook URL.
+    """POST all blocks to a Slack webhook URL in a single request.
+
+    The POST is not idempotent, so only failed connections and 429/5xx
+    responses are retried (up to twice); a timed-out or dropped response is
+    reported as a failure rather than resent, to avoid a duplicate post.
 
     Args:
         webhook_url: Slack incoming webhook URL
@@ -97,7 +124,7 @@ def send_to_slack(webhook_url: str, blocks: List[Dict], text: str = "Intelligems
     payload = {"text": text, "blocks": blocks}
 
     try:
-        response = requests.post(
+        response = _session.post(
             webhook_url,
             json=payload,
             headers={"Content-Type": "application/json"},
@@ -121,9 +148,12 @@ def parse_slack_args(argv: list) -> Optional[str]:
     """
     for i, arg in enumerate(argv):
         if arg == "--slack" and i + 1 < len(argv):
-            url = argv[i + 1]
-            if url.startswith("https://"):
-                return url
-            print(f"Warning: Slack webhook URL should start with https://")
-            return url
+            return check_slack_url(argv[i + 1])
     return None
+
+
+def check_slack_url(url: str) -> str:
+    """Warn if a webhook URL (e.g. from argparse) isn't https. Returns it unchanged."""
+    if not url.startswith("https://"):
+        print("Warning: Slack webhook URL should start with https://")
+    return url
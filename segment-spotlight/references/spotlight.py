@@ -8,14 +8,18 @@ Usage:
     python3 spotlight.py              # Lists active tests, prompts to pick
     python3 spotlight.py <test_id>    # Analyzes a specific test
     python3 spotlight.py <test_id> --slack <webhook_url>   # Send to Slack
+    python3 spotlight.py <test_id> --no-cache   # Skip the on-disk response cache
 """
 
 import sys
 import os
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 
 from ig_client import IntelligemsAPI
+from ig_cache import cached_call
 from ig_slack import (
     parse_slack_args, send_to_slack,
     header_block, section_block, fields_block, divider_block, context_block,
@@ -47,10 +51,26 @@ from ig_helpers import (
 )
 from ig_config import (
     SEGMENT_TYPES, MIN_CONFIDENCE, NEUTRAL_LIFT_THRESHOLD,
-    METRIC_LABELS, VERDICT_MIN_RUNTIME,
+    METRIC_LABELS, VERDICT_MIN_RUNTIME, CACHE_TTL, SEGMENT_CACHE_TTL,
 )
 
 
+# ── Data types ───────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class Segment:
+    """Result for one audience segment (e.g. Mobile, Returning Visitor)."""
+    name: str
+    type: str
+    verdict: str
+    uplift: Optional[float]
+    confidence: Optional[float]
+    visitors: int
+    revenue_opportunity: float
+    contradiction: bool
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────
 
 
@@ -97,33 +117,44 @@ def compute_revenue_opportunity(seg_visitors, uplift, control_rpv, days):
 
 def rollout_recommendation(segments):
     """Generate rollout recommendation based on segment results."""
-    winners = [s for s in segments if s["verdict"] == "WINNER"]
-    losers = [s for s in segments if s["verdict"] == "LOSER"]
-    low_data = [s for s in segments if s["verdict"] == "LOW DATA"]
+    # Count verdicts in one pass, keeping up to 3 names for the message
+    n_winners = n_losers = n_low_data = 0
+    winner_names = []
+    loser_names = []
+    for s in segments:
+        v = s.verdict
+        if v == "WINNER":
+            n_winners += 1
+            if len(winner_names) < 3:
+                winner_names.append(s.name)
+        elif v == "LOSER":
+            n_losers += 1
+            if len(loser_names) < 3:
+                loser_names.append(s.name)
+        elif v == "LOW DATA":
+            n_low_data += 1
     total = len(segments)
 
     if total == 0:
         return "HOLD", "No segment data available for analysis."
 
-    if len(losers) == 0 and len(winners) >= total * 0.5:
+    if n_losers == 0 and n_winners >= total * 0.5:
         return "ROLL OUT", "No losing segments. Roll out to all traffic."
 
-    if len(losers) > 0 and len(winners) > 0:
-        winner_names = ", ".join(s["name"] for s in winners[:3])
-        loser_names = ", ".join(s["name"] for s in losers[:3])
+    if n_losers > 0 and n_winners > 0:
         return "SEGMENT-SPECIFIC", (
             "Consider rolling out to {0} only. "
             "{1} {2} underperforming — exclude or investigate.".format(
-                winner_names,
-                loser_names,
-                "is" if len(losers) == 1 else "are",
+                ", ".join(winner_names),
+                ", ".join(loser_names),
+                "is" if n_losers == 1 else "are",
             )
         )
 
-    if len(losers) > 0 and len(winners) == 0:
+    if n_losers > 0:
         return "DON'T ROLL OUT", "No winning segments found. The variant is hurting performance."
 
-    if len(low_data) > total * 0.5:
+    if n_low_data > total * 0.5:
         return "HOLD", "Most segments have insufficient data. Let the test run longer."
 
     return "HOLD", "Mixed signals. Monitor for another few days before making a call."
@@ -147,6 +178,7 @@ def main():
 
     api = IntelligemsAPI(api_key)
     slack_url = parse_slack_args(sys.argv)
+    use_cache = "--no-cache" not in sys.argv
 
     # ── Select test ──────────────────────────────────────────────────
     args = []
@@ -158,6 +190,8 @@ def main():
         if arg == "--slack":
             skip_next = True
             continue
+        if arg == "--no-cache":
+            continue
         args.append(arg)
 
     test_id = args[0] if args else None
@@ -194,7 +228,10 @@ def main():
 
     # ── Fetch test data ──────────────────────────────────────────────
     print("\nFetching test details for {0}...".format(test_id))
-    experiment = api.get_experience_detail(test_id)
+    experiment = cached_call(
+        ("detail", test_id), CACHE_TTL,
+        lambda: api.get_experience_detail(test_id), api_key, enabled=use_cache,
+    )
     if not experiment or "id" not in experiment:
         print("ERROR: Could not find test with ID '{0}'.".format(test_id))
         sys.exit(1)
@@ -215,7 +252,10 @@ def main():
 
     # ── Overview analytics ────────────────────────────────────────
     print("Fetching overview analytics...")
-    analytics = api.get_overview_analytics(test_id)
+    analytics = cached_call(
+        ("overview", test_id), CACHE_TTL,
+        lambda: api.get_overview_analytics(test_id), api_key, enabled=use_cache,
+    )
     metrics = analytics.get("metrics", [])
     if not metrics:
         print("ERROR: No analytics data returned.")
@@ -243,51 +283,67 @@ def main():
     # ── Segment analysis ──────────────────────────────────────────
     all_segments = []
 
+    # Hoisted out of the per-segment loop so it only does numeric work
+    overall_positive = overall_uplift is not None and overall_uplift > NEUTRAL_LIFT_THRESHOLD
+    overall_negative = overall_uplift is not None and overall_uplift < -NEUTRAL_LIFT_THRESHOLD
+
     for seg_type, seg_label in SEGMENT_TYPES:
         print("Fetching {0} segments...".format(seg_label))
         try:
-            seg_data = api.get_segment_analytics(test_id, seg_type)
-            seg_metrics = seg_data.get("metrics", [])
-            if not seg_metrics:
-                continue
-
-            grouped = group_metrics_by_segment(seg_metrics)
-            for seg_name, seg_m in grouped.items():
-                seg_uplift = get_metric_uplift(seg_m, rev_metric, best_id)
-                seg_conf = get_metric_confidence(seg_m, rev_metric, best_id)
-                seg_visitors = get_variation_visitors(seg_m, best_id)
-                # Also count control visitors for total segment size
-                ctrl_visitors = get_variation_visitors(seg_m, control_id)
-                total_seg_visitors = seg_visitors + ctrl_visitors
-
-                v = segment_verdict(seg_conf, seg_uplift, days)
-                rev_opp = compute_revenue_opportunity(
-                    total_seg_visitors, seg_uplift, control_rpv, days
-                )
-
-                # Check for contradiction with overall
-                contradiction = False
-                if overall_uplift is not None and seg_uplift is not None:
-                    if overall_uplift > NEUTRAL_LIFT_THRESHOLD and seg_uplift < -NEUTRAL_LIFT_THRESHOLD:
-                        contradiction = True
-                    elif overall_uplift < -NEUTRAL_LIFT_THRESHOLD and seg_uplift > NEUTRAL_LIFT_THRESHOLD:
-                        contradiction = True
-
-                all_segments.append({
-                    "name": seg_name,
-                    "type": seg_label,
-                    "verdict": v,
-                    "uplift": seg_uplift,
-                    "confidence": seg_conf,
-                    "visitors": total_seg_visitors,
-                    "revenue_opportunity": rev_opp,
-                    "contradiction": contradiction,
-                })
+            seg_data = cached_call(
+                ("segment", test_id, seg_type), SEGMENT_CACHE_TTL,
+                lambda: api.get_segment_analytics(test_id, seg_type),
+                api_key, enabled=use_cache,
+            )
         except Exception as e:
             print("  Warning: Could not fetch {0} segments: {1}".format(seg_label, e))
+            continue
+
+        seg_metrics = seg_data["metrics"] if "metrics" in seg_data else None
+        if not seg_metrics:
+            continue
+
+        # Nothing to compare unless both variations have segment rows
+        variations_present = {m.get("variation_id") for m in seg_metrics}
+        if best_id not in variations_present or control_id not in variations_present:
+            continue
+
+        grouped = group_metrics_by_segment(seg_metrics)
+        for seg_name, seg_m in grouped.items():
+            seg_uplift = get_metric_uplift(seg_m, rev_metric, best_id)
+            seg_conf = get_metric_confidence(seg_m, rev_metric, best_id)
+            # Count both arms for total segment size
+            total_seg_visitors = (
+                get_variation_visitors(seg_m, best_id)
+                + get_variation_visitors(seg_m, control_id)
+            )
+
+            v = segment_verdict(seg_conf, seg_uplift, days)
+            rev_opp = compute_revenue_opportunity(
+                total_seg_visitors, seg_uplift, control_rpv, days
+            )
+
+            # Check for contradiction with overall
+            contradiction = False
+            if seg_uplift is not None:
+                contradiction = (
+                    (overall_positive and seg_uplift < -NEUTRAL_LIFT_THRESHOLD)
+                    or (overall_negative and seg_uplift > NEUTRAL_LIFT_THRESHOLD)
+                )
+
+            all_segments.append(Segment(
+                name=seg_name,
+                type=seg_label,
+                verdict=v,
+                uplift=seg_uplift,
+                confidence=seg_conf,
+                visitors=total_seg_visitors,
+                revenue_opportunity=rev_opp,
+                contradiction=contradiction,
+            ))
 
     # Sort by absolute revenue opportunity (descending)
-    all_segments.sort(key=lambda s: abs(s["revenue_opportunity"]), reverse=True)
+    all_segments.sort(key=lambda s: abs(s.revenue_opportunity), reverse=True)
 
     # Rollout recommendation
     rec_action, rec_reason = rollout_recommendation(all_segments)
@@ -313,31 +369,31 @@ def main():
         print("-" * 70)
 
         for s in all_segments:
-            flag = " ***" if s["contradiction"] else ""
+            flag = " ***" if s.contradiction else ""
             print("  {0:<16} {1:<14} {2:<12} {3:>7} {4:>7} {5:>12}{6}".format(
-                s["name"][:16],
-                s["type"][:14],
-                s["verdict"],
-                fmt_lift(s["uplift"]),
-                fmt_confidence(s["confidence"]),
-                fmt_currency(s["revenue_opportunity"]),
+                s.name[:16],
+                s.type[:14],
+                s.verdict,
+                fmt_lift(s.uplift),
+                fmt_confidence(s.confidence),
+                fmt_currency(s.revenue_opportunity),
                 flag,
             ))
 
         print()
 
         # Contradictions
-        contradictions = [s for s in all_segments if s["contradiction"]]
+        contradictions = [s for s in all_segments if s.contradiction]
         if contradictions:
             print("-" * 70)
             print("  CONTRADICTIONS (*** above)")
             print("-" * 70)
             for s in contradictions:
                 print("  {0} ({1}): Overall is {2} but this segment is {3} ({4})".format(
-                    s["name"], s["type"],
+                    s.name, s.type,
                     "positive" if overall_uplift > 0 else "negative",
-                    "negative" if s["uplift"] < 0 else "positive",
-                    fmt_lift(s["uplift"]),
+                    "negative" if s.uplift < 0 else "positive",
+                    fmt_lift(s.uplift),
                 ))
             print()
 
@@ -376,19 +432,16 @@ def main():
         blocks.append(divider_block())
 
         # Segment lines
-        seg_lines = []
-        for s in all_segments:
-            flag = " :warning:" if s["contradiction"] else ""
-            seg_lines.append(
-                "*{0}* ({1}) — {2}: {3} ({4} conf) | {5}/yr{6}".format(
-                    s["name"], s["type"], s["verdict"],
-                    fmt_lift(s["uplift"]), fmt_confidence(s["confidence"]),
-                    fmt_currency(s["revenue_opportunity"]), flag,
-                )
+        seg_lines = "\n".join(
+            "*{0}* ({1}) — {2}: {3} ({4} conf) | {5}/yr{6}".format(
+                s.name, s.type, s.verdict,
+                fmt_lift(s.uplift), fmt_confidence(s.confidence),
+                fmt_currency(s.revenue_opportunity),
+                " :warning:" if s.contradiction else "",
             )
-        blocks.append(section_block(
-            "*Revenue-Ranked Segments*\n" + "\n".join(seg_lines)
-        ))
+            for s in all_segments
+        )
+        blocks.append(section_block("*Revenue-Ranked Segments*\n" + seg_lines))
 
         blocks.append(divider_block())
 
@@ -9,36 +9,34 @@ Usage:
     python3 debrief.py              # Lists active tests, prompts to pick
     python3 debrief.py <test_id>    # Debriefs a specific test
     python3 debrief.py <test_id> --slack <webhook_url>   # Send to Slack
+    python3 debrief.py <test_id> --no-cache   # Skip the on-disk response cache
 """
 
+import argparse
+import operator
+import re
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from dotenv import load_dotenv
 
-from ig_client import IntelligemsAPI
-from ig_slack import (
-    parse_slack_args, send_to_slack,
-    header_block, section_block, divider_block, context_block,
-    verdict_emoji,
-)
+# requests/dotenv-backed modules (ig_client, ig_cache, ig_slack, dotenv) are
+# imported inside main() so --help and bad arguments exit without loading them.
 from ig_metrics import (
-    get_metric_value,
-    get_metric_uplift,
-    get_metric_confidence,
+    build_metric_index,
+    lookup_metric,
     get_total_visitors,
     get_total_orders,
     has_cogs_data,
     primary_revenue_metric,
     group_metrics_by_segment,
-    get_variation_visitors,
 )
 from ig_helpers import (
     find_control,
     find_variants,
     get_variation_name,
     runtime_days,
-    runtime_display,
+    runtime_info,
     fmt_lift,
     fmt_pct,
     fmt_confidence,
@@ -54,6 +52,24 @@ from ig_config import (
 )
 
 
+# ── Command line ─────────────────────────────────────────────────────────
+
+PARSER = argparse.ArgumentParser(
+    description="Post-mortem analysis for any A/B test outcome.",
+)
+PARSER.add_argument("test_id", nargs="?", help="Test ID (omit to pick from active tests)")
+PARSER.add_argument("--slack", metavar="WEBHOOK_URL", help="Send results to a Slack webhook")
+PARSER.add_argument("--no-cache", action="store_true", help="Skip the on-disk response cache")
+
+
+# ── Constants ────────────────────────────────────────────────────────────
+
+# Classifies visitor-type segment names ("New Visitor", "Returning") in one search
+VISITOR_RE = re.compile(r"(new|return)", re.IGNORECASE)
+
+_by_uplift = operator.itemgetter("uplift")
+
+
 # ── Verdict logic ────────────────────────────────────────────────────────
 
 
@@ -72,12 +88,12 @@ def compute_verdict(p2bb, uplift, days, total_orders):
     return "KEEP RUNNING"
 
 
-def pick_best_variant(variants, metrics, metric_name):
+def pick_best_variant(variants, metric_index, metric_name):
     """Find the variant with the highest uplift."""
     best = None
     best_uplift = None
     for v in variants:
-        uplift = get_metric_uplift(metrics, metric_name, v["id"])
+        uplift = lookup_metric(metric_index, metric_name, v["id"], "uplift")
         if uplift is not None and (best_uplift is None or uplift > best_uplift):
             best = v
             best_uplift = uplift
@@ -87,14 +103,14 @@ def pick_best_variant(variants, metrics, metric_name):
 # ── Funnel analysis ──────────────────────────────────────────────────────
 
 
-def analyze_funnel(metrics, control_id, variant_id):
+def analyze_funnel(metric_index, control_id, variant_id):
     """Analyze each funnel stage."""
     stages = []
     for metric_name, label in FUNNEL_STAGES:
-        uplift = get_metric_uplift(metrics, metric_name, variant_id)
-        confidence = get_metric_confidence(metrics, metric_name, variant_id)
-        control_val = get_metric_value(metrics, metric_name, control_id)
-        variant_val = get_metric_value(metrics, metric_name, variant_id)
+        uplift = lookup_metric(metric_index, metric_name, variant_id, "uplift")
+        confidence = lookup_metric(metric_index, metric_name, variant_id, "confidence")
+        control_val = lookup_metric(metric_index, metric_name, control_id, "value")
+        variant_val = lookup_metric(metric_index, metric_name, variant_id, "value")
 
         if control_val is None and variant_val is None:
             continue
@@ -105,6 +121,11 @@ def analyze_funnel(metrics, control_id, variant_id):
             "variant": variant_val,
             "uplift": uplift,
             "confidence": confidence,
+            # Pre-formatted once for both terminal and Slack output
+            "_ctrl_str": fmt_pct(control_val) if control_val else "—",
+            "_var_str": fmt_pct(variant_val) if variant_val else "—",
+            "_lift_str": fmt_lift(uplift),
+            "_conf_str": fmt_confidence(confidence),
         })
     return stages
 
@@ -113,33 +134,50 @@ def analyze_funnel(metrics, control_id, variant_id):
 
 
 def analyze_segments(api, test_id, rev_metric, best_id, control_id, days):
-    """Fetch and analyze all segment types. Returns list of segment results."""
-    all_segments = []
-
-    for seg_type, seg_label in SEGMENT_TYPES:
-        try:
-            seg_data = api.get_segment_analytics(test_id, seg_type)
-            seg_metrics = seg_data.get("metrics", [])
-            if not seg_metrics:
-                continue
-
-            grouped = group_metrics_by_segment(seg_metrics)
-            for seg_name, seg_m in grouped.items():
-                seg_uplift = get_metric_uplift(seg_m, rev_metric, best_id)
-                seg_conf = get_metric_confidence(seg_m, rev_metric, best_id)
-                seg_visitors = get_variation_visitors(seg_m, best_id)
-                ctrl_visitors = get_variation_visitors(seg_m, control_id)
-
-                all_segments.append({
-                    "name": seg_name,
-                    "type": seg_label,
-                    "uplift": seg_uplift,
-                    "confidence": seg_conf,
-                    "visitors": seg_visitors + ctrl_visitors,
-                })
-        except Exception as e:
-            print("  Warning: Could not fetch {0} segments: {1}".format(seg_label, e))
+    """Fetch and analyze all segment types. Returns list of segment results.
+
+    Segment types are fetched concurrently; results keep SEGMENT_TYPES order.
+    """
+    by_label = {}
+
+    with ThreadPoolExecutor(max_workers=len(SEGMENT_TYPES)) as executor:
+        futures = {
+            executor.submit(api.get_segment_analytics, test_id, seg_type): seg_label
+            for seg_type, seg_label in SEGMENT_TYPES
+        }
+        for future in as_completed(futures):
+            seg_label = futures[future]
+            try:
+                seg_data = future.result()
+                seg_metrics = seg_data.get("metrics", [])
+                if not seg_metrics:
+                    continue
+
+                results = []
+                grouped = group_metrics_by_segment(seg_metrics)
+                for seg_name, seg_m in grouped.items():
+                    seg_index = build_metric_index(seg_m, names=(rev_metric, "n_visitors"))
+                    seg_uplift = lookup_metric(seg_index, rev_metric, best_id, "uplift")
+                    seg_conf = lookup_metric(seg_index, rev_metric, best_id, "confidence")
+                    seg_visitors = int(lookup_metric(seg_index, "n_visitors", best_id, "value") or 0)
+                    ctrl_visitors = int(lookup_metric(seg_index, "n_visitors", control_id, "value") or 0)
+
+                    results.append({
+                        "name": seg_name,
+                        "type": seg_label,
+                        "uplift": seg_uplift,
+                        "confidence": seg_conf,
+                        "visitors": seg_visitors + ctrl_visitors,
+                        "_lift_str": fmt_lift(seg_uplift),
+                        "_conf_str": fmt_confidence(seg_conf),
+                    })
+                by_label[seg_label] = results
+            except Exception as e:
+                print("  Warning: Could not fetch {0} segments: {1}".format(seg_label, e))
 
+    all_segments = []
+    for _, seg_label in SEGMENT_TYPES:
+        all_segments.extend(by_label.get(seg_label, []))
     return all_segments
 
 
@@ -149,14 +187,43 @@ def generate_insights(segments, overall_uplift):
     if not segments:
         return insights
 
-    # Find strongest and weakest segments
-    with_data = [s for s in segments if s["uplift"] is not None]
-    if not with_data:
+    # One pass: strongest/weakest segments plus the per-type picks below
+    strongest = weakest = None
+    devices = []
+    n_visitor_types = 0
+    new_seg = returning_seg = None
+    pos_sources = []
+    neg_sources = []
+    for s in segments:
+        uplift = s["uplift"]
+        if uplift is None:
+            continue
+        if strongest is None or uplift > strongest["uplift"]:
+            strongest = s
+        if weakest is None or uplift < weakest["uplift"]:
+            weakest = s
+
+        seg_type = s["type"]
+        if seg_type == "Device":
+            devices.append(s)
+        elif seg_type == "Visitor Type":
+            n_visitor_types += 1
+            m = VISITOR_RE.search(s["name"])
+            if m:
+                if m.group(1).lower() == "new":
+                    if new_seg is None:
+                        new_seg = s
+                elif returning_seg is None:
+                    returning_seg = s
+        elif seg_type == "Traffic Source":
+            if uplift > NEUTRAL_LIFT_THRESHOLD:
+                pos_sources.append(s)
+            elif uplift < -NEUTRAL_LIFT_THRESHOLD:
+                neg_sources.append(s)
+
+    if strongest is None:
         return insights
 
-    strongest = max(with_data, key=lambda s: s["uplift"])
-    weakest = min(with_data, key=lambda s: s["uplift"])
-
     # Insight 1: Strongest segment
     if strongest["uplift"] > NEUTRAL_LIFT_THRESHOLD:
         insights.append(
@@ -184,55 +251,46 @@ def generate_insights(segments, overall_uplift):
             )
 
     # Insight 3: Device comparison
-    devices = [s for s in with_data if s["type"] == "Device"]
     if len(devices) >= 2:
-        devices.sort(key=lambda s: s["uplift"] or 0, reverse=True)
-        best_dev = devices[0]
-        worst_dev = devices[-1]
-        if best_dev["uplift"] is not None and worst_dev["uplift"] is not None:
-            diff = abs(best_dev["uplift"] - worst_dev["uplift"])
-            if diff > 0.05:  # >5% difference is noteworthy
-                insights.append(
-                    "{0} outperforms {1} by {2} — consider device-specific optimization.".format(
-                        best_dev["name"], worst_dev["name"],
-                        fmt_lift(diff),
-                    )
+        # Devices only hold segments with uplift data; reversed() keeps the
+        # previous tie-break (last of the lowest) for the worst device.
+        best_dev = max(devices, key=_by_uplift)
+        worst_dev = min(reversed(devices), key=_by_uplift)
+        diff = abs(best_dev["uplift"] - worst_dev["uplift"])
+        if diff > 0.05:  # >5% difference is noteworthy
+            insights.append(
+                "{0} outperforms {1} by {2} — consider device-specific optimization.".format(
+                    best_dev["name"], worst_dev["name"],
+                    fmt_lift(diff),
                 )
+            )
 
     # Insight 4: New vs returning
-    visitors = [s for s in with_data if s["type"] == "Visitor Type"]
-    if len(visitors) >= 2:
-        new = next((s for s in visitors if "new" in s["name"].lower()), None)
-        returning = next((s for s in visitors if "return" in s["name"].lower()), None)
-        if new and returning and new["uplift"] is not None and returning["uplift"] is not None:
-            diff = abs(new["uplift"] - returning["uplift"])
-            if diff > 0.03:
-                if new["uplift"] > returning["uplift"]:
-                    insights.append(
-                        "New visitors drove more of the lift ({0}) vs returning ({1}).".format(
-                            fmt_lift(new["uplift"]), fmt_lift(returning["uplift"]),
-                        )
+    if n_visitor_types >= 2 and new_seg and returning_seg:
+        diff = abs(new_seg["uplift"] - returning_seg["uplift"])
+        if diff > 0.03:
+            if new_seg["uplift"] > returning_seg["uplift"]:
+                insights.append(
+                    "New visitors drove more of the lift ({0}) vs returning ({1}).".format(
+                        fmt_lift(new_seg["uplift"]), fmt_lift(returning_seg["uplift"]),
                     )
-                else:
-                    insights.append(
-                        "Returning visitors responded more ({0}) vs new visitors ({1}).".format(
-                            fmt_lift(returning["uplift"]), fmt_lift(new["uplift"]),
-                        )
+                )
+            else:
+                insights.append(
+                    "Returning visitors responded more ({0}) vs new visitors ({1}).".format(
+                        fmt_lift(returning_seg["uplift"]), fmt_lift(new_seg["uplift"]),
                     )
+                )
 
     # Insight 5: Traffic source patterns
-    sources = [s for s in with_data if s["type"] == "Traffic Source"]
-    if sources:
-        positive_sources = [s for s in sources if s["uplift"] is not None and s["uplift"] > NEUTRAL_LIFT_THRESHOLD]
-        negative_sources = [s for s in sources if s["uplift"] is not None and s["uplift"] < -NEUTRAL_LIFT_THRESHOLD]
-        if positive_sources and negative_sources:
-            pos_names = ", ".join(s["name"] for s in positive_sources[:2])
-            neg_names = ", ".join(s["name"] for s in negative_sources[:2])
-            insights.append(
-                "Works for {0} traffic but not {1} — audience intent may differ.".format(
-                    pos_names, neg_names,
-                )
+    if pos_sources and neg_sources:
+        pos_names = ", ".join(s["name"] for s in pos_sources[:2])
+        neg_names = ", ".join(s["name"] for s in neg_sources[:2])
+        insights.append(
+            "Works for {0} traffic but not {1} — audience intent may differ.".format(
+                pos_names, neg_names,
             )
+        )
 
     return insights
 
@@ -247,14 +305,14 @@ def suggest_next_tests(verdict, test_type, funnel_stages, insights, segments):
         gains = [s for s in funnel_stages if s["uplift"] is not None and s["uplift"] > NEUTRAL_LIFT_THRESHOLD]
 
         if drops:
-            worst_stage = min(drops, key=lambda s: s["uplift"])
+            worst_stage = min(drops, key=_by_uplift)
             suggestions.append(
                 "Fix the {0} stage ({1}) — test changes specifically targeting this step.".format(
                     worst_stage["label"], fmt_lift(worst_stage["uplift"]),
                 )
             )
         if gains:
-            best_stage = max(gains, key=lambda s: s["uplift"])
+            best_stage = max(gains, key=_by_uplift)
             suggestions.append(
                 "Double down on {0} ({1}) — this stage is working, push it further.".format(
                     best_stage["label"], fmt_lift(best_stage["uplift"]),
@@ -265,7 +323,7 @@ def suggest_next_tests(verdict, test_type, funnel_stages, insights, segments):
     contradictions = [s for s in segments
                       if s["uplift"] is not None and s["uplift"] < -NEUTRAL_LIFT_THRESHOLD]
     if contradictions:
-        worst_seg = min(contradictions, key=lambda s: s["uplift"])
+        worst_seg = min(contradictions, key=_by_uplift)
         suggestions.append(
             "Investigate why {0} ({1}) underperforms — consider a {0}-specific test.".format(
                 worst_seg["name"], worst_seg["type"],
@@ -295,6 +353,12 @@ def suggest_next_tests(verdict, test_type, funnel_stages, insights, segments):
 
 
 def main():
+    args = PARSER.parse_args()
+
+    from dotenv import load_dotenv
+    from ig_client import IntelligemsAPI
+    from ig_cache import cached_call, cache_ttl
+
     env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
     if os.path.exists(env_path):
         load_dotenv(env_path)
@@ -307,21 +371,14 @@ def main():
         sys.exit(1)
 
     api = IntelligemsAPI(api_key)
-    slack_url = parse_slack_args(sys.argv)
+    slack_url = None
+    if args.slack:
+        from ig_slack import check_slack_url
+        slack_url = check_slack_url(args.slack)
+    use_cache = not args.no_cache
 
     # ── Select test ──────────────────────────────────────────────
-    args = []
-    skip_next = False
-    for arg in sys.argv[1:]:
-        if skip_next:
-            skip_next = False
-            continue
-        if arg == "--slack":
-            skip_next = True
-            continue
-        args.append(arg)
-
-    test_id = args[0] if args else None
+    test_id = args.test_id
     if not test_id:
         print("Fetching active experiments...")
         experiments = api.get_active_experiments()
@@ -355,7 +412,10 @@ def main():
 
     # ── Fetch data ───────────────────────────────────────────────
     print("\nFetching test details for {0}...".format(test_id))
-    experiment = api.get_experience_detail(test_id)
+    experiment = cached_call(
+        ("detail", test_id), cache_ttl,
+        lambda: api.get_experience_detail(test_id), api_key, enabled=use_cache,
+    )
     if not experiment or "id" not in experiment:
         print("ERROR: Could not find test with ID '{0}'.".format(test_id))
         sys.exit(1)
@@ -371,15 +431,18 @@ def main():
         sys.exit(1)
 
     started_ts = experiment.get("startedAtTs") or experiment.get("startedAt")
-    days = runtime_days(started_ts)
-    days_display = runtime_display(started_ts)
+    days, days_display = runtime_info(started_ts)
 
     print("Fetching overview analytics...")
-    analytics = api.get_overview_analytics(test_id)
+    analytics = cached_call(
+        ("overview", test_id), cache_ttl(experiment),
+        lambda: api.get_overview_analytics(test_id), api_key, enabled=use_cache,
+    )
     metrics = analytics.get("metrics", [])
     if not metrics:
         print("ERROR: No analytics data returned.")
         sys.exit(1)
+    metric_index = build_metric_index(metrics)
 
     total_visitors = get_total_visitors(metrics)
     total_orders = get_total_orders(metrics)
@@ -388,7 +451,7 @@ def main():
     rev_label = METRIC_LABELS.get(rev_metric, rev_metric)
 
     # Best variant
-    best = pick_best_variant(variant_list, metrics, rev_metric)
+    best = pick_best_variant(variant_list, metric_index, rev_metric)
     if not best:
         best = variant_list[0]
     best_id = best["id"]
@@ -397,23 +460,26 @@ def main():
     control_name = get_variation_name(variations, control_id)
 
     # Key metrics
-    uplift = get_metric_uplift(metrics, rev_metric, best_id)
-    confidence = get_metric_confidence(metrics, rev_metric, best_id)
-    cr_uplift = get_metric_uplift(metrics, "conversion_rate", best_id)
-    cr_conf = get_metric_confidence(metrics, "conversion_rate", best_id)
+    uplift = lookup_metric(metric_index, rev_metric, best_id, "uplift")
+    confidence = lookup_metric(metric_index, rev_metric, best_id, "confidence")
+    cr_uplift = lookup_metric(metric_index, "conversion_rate", best_id, "uplift")
+    cr_conf = lookup_metric(metric_index, "conversion_rate", best_id, "confidence")
 
     # Verdict
     verdict = compute_verdict(confidence, uplift, days, total_orders)
 
     # Funnel analysis
-    funnel_stages = analyze_funnel(metrics, control_id, best_id)
-
-    # Segment analysis
-    print("Fetching segment data...")
-    segments = analyze_segments(api, test_id, rev_metric, best_id, control_id, days)
+    funnel_stages = analyze_funnel(metric_index, control_id, best_id)
 
-    # Insights
-    insights = generate_insights(segments, uplift)
+    # Segment analysis + insights (skipped for TOO EARLY tests — segment
+    # splits of an immature test are noise and cost one API call per type)
+    if verdict == "TOO EARLY":
+        segments = []
+        insights = []
+    else:
+        print("Fetching segment data...")
+        segments = analyze_segments(api, test_id, rev_metric, best_id, control_id, days)
+        insights = generate_insights(segments, uplift)
 
     # Next test suggestions
     suggestions = suggest_next_tests(verdict, test_type, funnel_stages, insights, segments)
@@ -444,11 +510,9 @@ def main():
         if funnel_stages:
             print("--- WHY IT HAPPENED: FUNNEL ---")
             for s in funnel_stages:
-                ctrl_str = fmt_pct(s["control"]) if s["control"] else "—"
-                var_str = fmt_pct(s["variant"]) if s["variant"] else "—"
                 print("  {0:<22} {1:>6} → {2:>6} ({3}, {4} conf)".format(
-                    s["label"], ctrl_str, var_str,
-                    fmt_lift(s["uplift"]), fmt_confidence(s["confidence"]),
+                    s["label"], s["_ctrl_str"], s["_var_str"],
+                    s["_lift_str"], s["_conf_str"],
                 ))
             print()
 
@@ -457,8 +521,7 @@ def main():
             print("--- WHY IT HAPPENED: SEGMENTS ---")
             for s in segments:
                 print("  {0:<16} ({1:<14}) {2:>7} ({3})".format(
-                    s["name"][:16], s["type"][:14],
-                    fmt_lift(s["uplift"]), fmt_confidence(s["confidence"]),
+                    s["name"][:16], s["type"][:14], s["_lift_str"], s["_conf_str"],
                 ))
             print()
 
@@ -478,50 +541,49 @@ def main():
 
     else:
         # ── Slack output ──────────────────────────────────────
-        blocks = []
+        from ig_slack import (
+            send_to_slack,
+            header_block, section_block, divider_block, context_block,
+            verdict_emoji,
+        )
 
         emoji = verdict_emoji(verdict)
-        blocks.append(header_block("{0} Test Debrief: {1}".format(emoji, verdict)))
-
-        # What happened
-        blocks.append(section_block(
-            "*{0}*\n"
-            "Type: {1} | Runtime: {2}\n"
-            "Variant: {3} vs Control: {4}\n"
-            "{5}: {6} ({7} confidence)".format(
-                test_name, test_type, days_display,
-                best_name, control_name,
-                rev_label, fmt_lift(uplift), fmt_confidence(confidence),
-            )
-        ))
-
-        blocks.append(divider_block())
+        blocks = [
+            header_block("{0} Test Debrief: {1}".format(emoji, verdict)),
+            # What happened
+            section_block(
+                "*{0}*\n"
+                "Type: {1} | Runtime: {2}\n"
+                "Variant: {3} vs Control: {4}\n"
+                "{5}: {6} ({7} confidence)".format(
+                    test_name, test_type, days_display,
+                    best_name, control_name,
+                    rev_label, fmt_lift(uplift), fmt_confidence(confidence),
+                )
+            ),
+            divider_block(),
+        ]
 
         # Funnel
         if funnel_stages:
-            funnel_lines = []
-            for s in funnel_stages:
-                ctrl_str = fmt_pct(s["control"]) if s["control"] else "—"
-                var_str = fmt_pct(s["variant"]) if s["variant"] else "—"
-                funnel_lines.append("*{0}:* {1} → {2} ({3})".format(
-                    s["label"], ctrl_str, var_str, fmt_lift(s["uplift"]),
-                ))
-            blocks.append(section_block("*Funnel Analysis*\n" + "\n".join(funnel_lines)))
+            blocks.append(section_block("*Funnel Analysis*\n" + "\n".join(
+                f"*{s['label']}:* {s['_ctrl_str']} → {s['_var_str']} ({s['_lift_str']})"
+                for s in funnel_stages
+            )))
 
         # Insights
         if insights:
             blocks.append(section_block(
-                "*Customer Behavior Insights*\n" +
-                "\n".join("- {0}".format(ins) for ins in insights)
+                "*Customer Behavior Insights*\n" + "\n".join(f"- {ins}" for ins in insights)
             ))
 
-        # Next tests
-        blocks.append(section_block(
-            "*What to Test Next*\n" +
-            "\n".join("- {0}".format(s) for s in suggestions)
-        ))
-
-        blocks.append(context_block("Powered by Intelligems Analytics"))
+        blocks += [
+            # Next tests
+            section_block(
+                "*What to Test Next*\n" + "\n".join(f"- {s}" for s in suggestions)
+            ),
+            context_block("Powered by Intelligems Analytics"),
+        ]
 
         fallback = "Test Debrief: {0} — {1}".format(verdict, test_name)
         success = send_to_slack(slack_url, blocks, text=fallback)
@@ -11,19 +11,16 @@ Usage:
 
 import sys
 import os
-from datetime import datetime
-from collections import defaultdict
-from dotenv import load_dotenv
+import heapq
+import operator
+import time
+from collections import Counter
+from itertools import chain
 
 from ig_client import IntelligemsAPI
-from ig_slack import (
-    parse_slack_args, send_to_slack,
-    header_block, section_block, fields_block, divider_block, context_block,
-    status_emoji,
-)
 from ig_metrics import (
-    get_metric_uplift,
-    get_metric_confidence,
+    build_metric_index,
+    lookup_metric,
     get_total_visitors,
     get_total_orders,
     has_cogs_data,
@@ -45,7 +42,7 @@ from ig_helpers import (
 )
 from ig_config import (
     MIN_CONFIDENCE, NEUTRAL_LIFT_THRESHOLD,
-    VERDICT_MIN_RUNTIME, VERDICT_MIN_ORDERS, METRIC_LABELS,
+    VERDICT_MIN_RUNTIME, VERDICT_MIN_ORDERS, METRIC_LABELS, MS_PER_DAY,
 )
 
 
@@ -53,35 +50,46 @@ from ig_config import (
 
 ALL_TEST_TYPES = ["Pricing", "Shipping", "Offer", "Content"]
 
+_ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+
+# Why each untested type is worth a look (used for coverage-gap suggestions)
+_COVERAGE_REASONS = {
+    "Pricing": "Pricing tests often have the highest revenue impact per visitor.",
+    "Shipping": "Shipping is a major checkout friction point — worth testing thresholds.",
+    "Offer": "Offer/discount testing can reveal optimal promotional strategies.",
+    "Content": "Content tests help refine messaging and product presentation.",
+}
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────
 
 
 def compute_verdict(p2bb, uplift, days, total_orders):
     """Determine verdict for a test."""
-    if days < VERDICT_MIN_RUNTIME or total_orders < VERDICT_MIN_ORDERS:
-        return "TOO EARLY"
-    if p2bb is None or uplift is None:
+    if (p2bb is None or uplift is None
+            or days < VERDICT_MIN_RUNTIME or total_orders < VERDICT_MIN_ORDERS):
         return "TOO EARLY"
-    if p2bb >= MIN_CONFIDENCE and uplift > NEUTRAL_LIFT_THRESHOLD:
-        return "WINNER"
-    if (1 - p2bb) >= MIN_CONFIDENCE and uplift < -NEUTRAL_LIFT_THRESHOLD:
-        return "LOSER"
-    if days >= 21 and abs(uplift) <= NEUTRAL_LIFT_THRESHOLD:
-        return "FLAT"
-    return "KEEP RUNNING"
+    # Lift inside the neutral band can only be FLAT; outside it, only a
+    # winner or loser in the direction of the lift
+    if abs(uplift) <= NEUTRAL_LIFT_THRESHOLD:
+        return "FLAT" if days >= 21 else "KEEP RUNNING"
+    if uplift > 0:
+        return "WINNER" if p2bb >= MIN_CONFIDENCE else "KEEP RUNNING"
+    return "LOSER" if (1 - p2bb) >= MIN_CONFIDENCE else "KEEP RUNNING"
 
 
-def best_variant_metrics(variants, metrics, metric_name):
+def best_variant_metrics(variants, metric_index, metric_name):
     """Get the best variant's uplift and confidence."""
-    best_uplift = None
-    best_conf = None
+    uplifts = []
     for v in variants:
-        uplift = get_metric_uplift(metrics, metric_name, v["id"])
-        if uplift is not None and (best_uplift is None or uplift > best_uplift):
-            best_uplift = uplift
-            best_conf = get_metric_confidence(metrics, metric_name, v["id"])
-    return best_uplift, best_conf
+        uplift = lookup_metric(metric_index, metric_name, v["id"], "uplift")
+        if uplift is not None:
+            uplifts.append((uplift, v["id"]))
+    if not uplifts:
+        return None, None
+    # max() keeps the first of equal uplifts, matching a strict > scan
+    best_uplift, best_id = max(uplifts, key=operator.itemgetter(0))
+    return best_uplift, lookup_metric(metric_index, metric_name, best_id, "confidence")
 
 
 def get_start_month(experiment):
@@ -89,8 +97,8 @@ def get_start_month(experiment):
     ts = experiment.get("startedAtTs") or experiment.get("startedAt")
     if not ts:
         return None
-    dt = datetime.fromtimestamp(ts / 1000)
-    return dt.strftime("%Y-%m")
+    tm = time.localtime(ts // 1000)
+    return "%04d-%02d" % (tm.tm_year, tm.tm_mon)
 
 
 def compute_ended_runtime(experiment):
@@ -99,21 +107,19 @@ def compute_ended_runtime(experiment):
     ended = experiment.get("endedAtTs") or experiment.get("endedAt")
     if not started:
         return 0
-    start_dt = datetime.fromtimestamp(started / 1000)
-    if ended:
-        end_dt = datetime.fromtimestamp(ended / 1000)
-    else:
-        end_dt = datetime.now()
-    return max((end_dt - start_dt).days, 0)
+    if not ended:
+        ended = time.time() * 1000
+    return max(int((ended - started) // MS_PER_DAY), 0)
 
 
 # ── Main ─────────────────────────────────────────────────────────────────
 
 
 def main():
-    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
-    if os.path.exists(env_path):
-        load_dotenv(env_path)
+    from dotenv import load_dotenv
+
+    if os.path.exists(_ENV_PATH):
+        load_dotenv(_ENV_PATH)
     else:
         load_dotenv()
 
@@ -123,7 +129,10 @@ def main():
         sys.exit(1)
 
     api = IntelligemsAPI(api_key)
-    slack_url = parse_slack_args(sys.argv)
+    slack_url = None
+    if "--slack" in sys.argv:
+        from ig_slack import parse_slack_args
+        slack_url = parse_slack_args(sys.argv)
 
     # ── Fetch all experiments ─────────────────────────────────────
     print("Fetching active experiments...")
@@ -134,49 +143,69 @@ def main():
     ended = api.get_ended_experiments()
     print("Found {0} ended".format(len(ended)))
 
-    all_tests = active + ended
-    if not all_tests:
+    total_tests = len(active) + len(ended)
+    if not total_tests:
         print("\nNo experiments found. Your testing program hasn't started yet!")
         sys.exit(0)
 
+    # Derive type/month once per experiment; every loop below reads these
+    meta = [
+        {
+            "exp": exp,
+            "type": detect_test_type(exp),
+            "month": get_start_month(exp),
+            "started_ts": exp.get("startedAtTs") or exp.get("startedAt"),
+        }
+        for exp in chain(active, ended)
+    ]
+    meta_active = meta[:len(active)]
+    meta_ended = meta[len(active):]
+
     # ── Analyze ended tests ───────────────────────────────────────
     print("\nAnalyzing ended tests for verdicts...")
-    ended_results = []
-
-    for exp in ended:
-        name = exp.get("name", "Unnamed")
-        exp_id = exp.get("id", "")
-        test_type = detect_test_type(exp)
-        days = compute_ended_runtime(exp)
-        start_month = get_start_month(exp)
-
-        print("  Analyzing: {0}...".format(name[:40]))
-        try:
-            analytics = api.get_overview_analytics(exp_id)
-            metrics = analytics.get("metrics", [])
-        except Exception as e:
-            print("    Warning: Could not fetch analytics: {0}".format(e))
-            ended_results.append({
-                "name": name,
-                "type": test_type,
-                "days": days,
-                "month": start_month,
-                "verdict": "ERROR",
-                "uplift": None,
-                "confidence": None,
-            })
+
+    ended_results = [
+        {
+            "name": m["exp"].get("name", "Unnamed"),
+            "type": m["type"],
+            "days": compute_ended_runtime(m["exp"]),
+            "month": m["month"],
+            "verdict": "ERROR",
+            "uplift": None,
+            "confidence": None,
+        }
+        for m in meta_ended
+    ]
+
+    # A test that ran under the minimum runtime is TOO EARLY whatever its
+    # analytics say, so only fetch the rest
+    pending = []
+    for i, result in enumerate(ended_results):
+        if result["days"] < VERDICT_MIN_RUNTIME:
+            result["verdict"] = "TOO EARLY"
+        else:
+            pending.append(i)
+    n_short = sum(r["verdict"] == "TOO EARLY" for r in ended_results)
+    if n_short:
+        print("  Skipping {0} tests that ran under {1} days (too early)".format(
+            n_short, VERDICT_MIN_RUNTIME))
+
+    # Analyze each test as its analytics land (completion order); results
+    # are filled in by list position so the scorecard order is stable.
+    pending_ids = [meta_ended[i]["exp"].get("id", "") for i in pending]
+    for k, analytics in api.iter_overview_analytics(pending_ids):
+        i = pending[k]
+        exp = meta_ended[i]["exp"]
+        result = ended_results[i]
+
+        print("  Analyzing: {0:.40}...".format(result["name"]))
+        if isinstance(analytics, Exception):
+            print("    Warning: Could not fetch analytics: {0}".format(analytics))
             continue
 
+        metrics = analytics.get("metrics", [])
         if not metrics:
-            ended_results.append({
-                "name": name,
-                "type": test_type,
-                "days": days,
-                "month": start_month,
-                "verdict": "NO DATA",
-                "uplift": None,
-                "confidence": None,
-            })
+            result["verdict"] = "NO DATA"
             continue
 
         variations = exp.get("variations", [])
@@ -184,65 +213,50 @@ def main():
         total_orders = get_total_orders(metrics)
         rev_metric = primary_revenue_metric(metrics)
 
-        uplift, conf = best_variant_metrics(variant_list, metrics, rev_metric)
-        verdict = compute_verdict(conf, uplift, days, total_orders)
-
-        ended_results.append({
-            "name": name,
-            "type": test_type,
-            "days": days,
-            "month": start_month,
-            "verdict": verdict,
-            "uplift": uplift,
-            "confidence": conf,
-        })
+        metric_index = build_metric_index(metrics, names=(rev_metric,))
+        uplift, conf = best_variant_metrics(variant_list, metric_index, rev_metric)
+        result["verdict"] = compute_verdict(conf, uplift, result["days"], total_orders)
+        result["uplift"] = uplift
+        result["confidence"] = conf
 
     # ── Compute scorecard metrics ─────────────────────────────────
 
-    # Win rate (only count callable tests)
-    callable_verdicts = [r for r in ended_results if r["verdict"] in ("WINNER", "LOSER", "FLAT")]
-    winners = [r for r in callable_verdicts if r["verdict"] == "WINNER"]
-    losers = [r for r in callable_verdicts if r["verdict"] == "LOSER"]
-    flat = [r for r in callable_verdicts if r["verdict"] == "FLAT"]
-    win_rate = len(winners) / len(callable_verdicts) * 100 if callable_verdicts else 0
-
-    # Average runtime
-    all_days = [r["days"] for r in ended_results if r["days"] > 0]
-    avg_runtime = sum(all_days) / len(all_days) if all_days else 0
-
-    # Test velocity (tests started per month)
-    monthly_counts = defaultdict(int)
-    for exp in all_tests:
-        month = get_start_month(exp)
-        if month:
-            monthly_counts[month] += 1
-    months_sorted = sorted(monthly_counts.keys())
-    if len(months_sorted) >= 2:
-        tests_per_month = sum(monthly_counts.values()) / len(months_sorted)
-    elif len(months_sorted) == 1:
-        tests_per_month = monthly_counts[months_sorted[0]]
-    else:
-        tests_per_month = 0
-
-    # Coverage map
-    type_counts = defaultdict(int)
-    for exp in all_tests:
-        t = detect_test_type(exp)
-        type_counts[t] += 1
+    # Win rate (only count callable tests) and average runtime, one pass
+    winners = []
+    n_losers = n_flat = n_inconclusive = 0
+    days_total = n_with_days = 0
+    for r in ended_results:
+        if r["days"] > 0:
+            days_total += r["days"]
+            n_with_days += 1
+        verdict = r["verdict"]
+        if verdict == "WINNER":
+            winners.append(r)
+        elif verdict == "LOSER":
+            n_losers += 1
+        elif verdict == "FLAT":
+            n_flat += 1
+        elif verdict in ("TOO EARLY", "KEEP RUNNING"):
+            n_inconclusive += 1
+    n_callable = len(winners) + n_losers + n_flat
+    win_rate = len(winners) / n_callable * 100 if n_callable else 0
+    avg_runtime = days_total / n_with_days if n_with_days else 0
+
+    # Test velocity (tests started per month) and coverage map
+    monthly_counts = Counter(m["month"] for m in meta if m["month"])
+    type_counts = Counter(m["type"] for m in meta)
+    n_months = len(monthly_counts)
+    tests_per_month = sum(monthly_counts.values()) / n_months if n_months else 0
 
     coverage_gaps = [t for t in ALL_TEST_TYPES if t not in type_counts]
 
     # Active tests summary
     active_summary = []
-    for exp in active:
-        name = exp.get("name", "Unnamed")
-        test_type = detect_test_type(exp)
-        ts = exp.get("startedAtTs") or exp.get("startedAt")
-        d = runtime_days(ts)
+    for m in meta_active:
         active_summary.append({
-            "name": name,
-            "type": test_type,
-            "days": d,
+            "name": m["exp"].get("name", "Unnamed"),
+            "type": m["type"],
+            "days": runtime_days(m["started_ts"]),
         })
 
     # ── Suggestions ───────────────────────────────────────────────
@@ -250,18 +264,12 @@ def main():
 
     if coverage_gaps:
         for gap in coverage_gaps:
-            reasons = {
-                "Pricing": "Pricing tests often have the highest revenue impact per visitor.",
-                "Shipping": "Shipping is a major checkout friction point — worth testing thresholds.",
-                "Offer": "Offer/discount testing can reveal optimal promotional strategies.",
-                "Content": "Content tests help refine messaging and product presentation.",
-            }
-            suggestions.append("Try {0} testing — {1}".format(gap, reasons.get(gap, "")))
-
-    if win_rate < 30 and len(callable_verdicts) >= 3:
+            suggestions.append("Try {0} testing — {1}".format(gap, _COVERAGE_REASONS.get(gap, "")))
+
+    if win_rate < 30 and n_callable >= 3:
         suggestions.append("Win rate is low ({0:.0f}%). Consider testing bolder changes or different levers.".format(win_rate))
 
-    if tests_per_month < 2 and len(months_sorted) >= 2:
+    if tests_per_month < 2 and n_months >= 2:
         suggestions.append("Testing velocity is low ({0:.1f}/month). Aim for 2-4 tests per month.".format(tests_per_month))
 
     if not suggestions:
@@ -269,86 +277,91 @@ def main():
 
     # ── Output ────────────────────────────────────────────────────
     if not slack_url:
-        print("\n" + "=" * 60)
-        print("  TEST PORTFOLIO SCORECARD")
-        print("=" * 60)
+        out = []
+        add = out.append
+
+        add("\n" + "=" * 60)
+        add("  TEST PORTFOLIO SCORECARD")
+        add("=" * 60)
 
         # Program summary
-        print("\n--- PROGRAM SUMMARY ---")
-        print("  Total tests: {0} ({1} ended, {2} active)".format(
-            len(all_tests), len(ended), len(active)))
-        print("  Win rate: {0:.0f}% ({1} winners / {2} callable)".format(
-            win_rate, len(winners), len(callable_verdicts)))
-        print("  Average runtime: {0:.0f} days".format(avg_runtime))
-        print("  Test velocity: {0:.1f} tests/month".format(tests_per_month))
-        print()
+        add("\n--- PROGRAM SUMMARY ---")
+        add("  Total tests: {0} ({1} ended, {2} active)".format(
+            total_tests, len(ended), len(active)))
+        add("  Win rate: {0:.0f}% ({1} winners / {2} callable)".format(
+            win_rate, len(winners), n_callable))
+        add("  Average runtime: {0:.0f} days".format(avg_runtime))
+        add("  Test velocity: {0:.1f} tests/month".format(tests_per_month))
+        add("")
 
         # Win/loss record
-        print("--- WIN/LOSS RECORD ---")
-        print("  Winners:  {0}".format(len(winners)))
-        print("  Losers:   {0}".format(len(losers)))
-        print("  Flat:     {0}".format(len(flat)))
-        too_early = len([r for r in ended_results if r["verdict"] in ("TOO EARLY", "KEEP RUNNING")])
-        if too_early:
-            print("  Inconclusive: {0}".format(too_early))
-        print()
+        add("--- WIN/LOSS RECORD ---")
+        add("  Winners:  {0}".format(len(winners)))
+        add("  Losers:   {0}".format(n_losers))
+        add("  Flat:     {0}".format(n_flat))
+        if n_inconclusive:
+            add("  Inconclusive: {0}".format(n_inconclusive))
+        add("")
 
         # Winners detail
         if winners:
-            print("  Top winners:")
-            winners_sorted = sorted(winners, key=lambda r: r["uplift"] or 0, reverse=True)
-            for w in winners_sorted[:5]:
-                print("    {0} ({1}): {2} lift".format(
-                    w["name"][:35], w["type"], fmt_lift(w["uplift"])))
-            print()
+            add("  Top winners:")
+            for w in heapq.nlargest(5, winners, key=lambda r: r["uplift"] or 0):
+                add(f"    {w['name']:.35} ({w['type']}): {fmt_lift(w['uplift'])} lift")
+            add("")
 
         # Coverage
-        print("--- COVERAGE MAP ---")
+        add("--- COVERAGE MAP ---")
         for test_type in ALL_TEST_TYPES:
             count = type_counts.get(test_type, 0)
             bar = "#" * min(count, 20)
-            status = "  " if count > 0 else "  GAP"
-            print("  {0:<10} {1:>3} tests  {2}{3}".format(
-                test_type, count, bar, status if count == 0 else ""))
-        print()
+            gap = "" if count else "  GAP"
+            add(f"  {test_type:<10} {count:>3} tests  {bar}{gap}")
+        add("")
 
         if coverage_gaps:
-            print("  Gaps: {0}".format(", ".join(coverage_gaps)))
-            print()
+            add("  Gaps: {0}".format(", ".join(coverage_gaps)))
+            add("")
 
         # Test velocity by month
-        if months_sorted:
-            print("--- TEST VELOCITY ---")
-            for month in months_sorted[-6:]:  # Last 6 months
+        if monthly_counts:
+            add("--- TEST VELOCITY ---")
+            # Last 6 months; YYYY-MM keys order chronologically as strings
+            for month in sorted(heapq.nlargest(6, monthly_counts)):
                 count = monthly_counts[month]
                 bar = "#" * count
-                print("  {0}  {1:>2} tests  {2}".format(month, count, bar))
-            print()
+                add(f"  {month}  {count:>2} tests  {bar}")
+            add("")
 
         # Active tests
         if active_summary:
-            print("--- ACTIVE TESTS ---")
+            add("--- ACTIVE TESTS ---")
             for t in active_summary:
-                print("  {0} ({1}, {2} days)".format(
-                    t["name"][:40], t["type"], t["days"]))
-            print()
+                add(f"  {t['name']:.40} ({t['type']}, {t['days']} days)")
+            add("")
 
         # Suggestions
-        print("--- WHAT TO TEST NEXT ---")
+        add("--- WHAT TO TEST NEXT ---")
         for i, s in enumerate(suggestions, 1):
-            print("  {0}. {1}".format(i, s))
-        print()
-        print("=" * 60)
+            add(f"  {i}. {s}")
+        add("")
+        add("=" * 60)
+        sys.stdout.write("\n".join(out) + "\n")
 
     else:
         # ── Slack output ──────────────────────────────────────
+        from ig_slack import (
+            send_to_slack,
+            header_block, section_block, fields_block, divider_block, context_block,
+        )
+
         blocks = []
 
         blocks.append(header_block("Test Portfolio Scorecard"))
 
         # Summary fields
         blocks.append(fields_block([
-            "*Total Tests:* {0}".format(len(all_tests)),
+            "*Total Tests:* {0}".format(total_tests),
             "*Win Rate:* {0:.0f}%".format(win_rate),
             "*Avg Runtime:* {0:.0f} days".format(avg_runtime),
             "*Velocity:* {0:.1f}/month".format(tests_per_month),
@@ -360,18 +373,15 @@ def main():
         blocks.append(section_block(
             "*Win/Loss Record*\n"
             "Winners: {0} | Losers: {1} | Flat: {2}".format(
-                len(winners), len(losers), len(flat))
+                len(winners), n_losers, n_flat)
         ))
 
         # Top winners
         if winners:
-            winners_sorted = sorted(winners, key=lambda r: r["uplift"] or 0, reverse=True)
-            winner_lines = []
-            for w in winners_sorted[:3]:
-                winner_lines.append("- {0} ({1}): {2}".format(
-                    w["name"][:30], w["type"], fmt_lift(w["uplift"])))
-            blocks.append(section_block(
-                "*Top Winners*\n" + "\n".join(winner_lines)))
+            winner_lines = "\n".join(
+                "- {0:.30} ({1}): {2}".format(w["name"], w["type"], fmt_lift(w["uplift"]))
+                for w in heapq.nlargest(3, winners, key=lambda r: r["uplift"] or 0))
+            blocks.append(section_block("*Top Winners*\n" + winner_lines))
 
         # Coverage
         coverage_lines = []
@@ -388,8 +398,8 @@ def main():
         if active_summary:
             active_lines = []
             for t in active_summary:
-                active_lines.append("- {0} ({1}, {2}d)".format(
-                    t["name"][:30], t["type"], t["days"]))
+                active_lines.append("- {0:.30} ({1}, {2}d)".format(
+                    t["name"], t["type"], t["days"]))
             blocks.append(section_block(
                 "*Active Tests ({0})*\n".format(len(active_summary)) +
                 "\n".join(active_lines)))
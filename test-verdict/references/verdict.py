@@ -9,26 +9,27 @@ Usage:
     python3 verdict.py              # Lists active tests, prompts to pick one
     python3 verdict.py <test_id>    # Analyzes a specific test (active or ended)
     python3 verdict.py <test_id> --slack <webhook_url>   # Send results to Slack
+    python3 verdict.py <test_id> --no-cache   # Skip the on-disk response cache
 """
 
+import argparse
+import operator
 import sys
 import os
-from datetime import datetime
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 
 from ig_client import IntelligemsAPI
-from ig_slack import parse_slack_args, send_to_slack, header_block, section_block, fields_block, divider_block, context_block, verdict_emoji
+from ig_cache import cached_call, cache_ttl
+from ig_slack import check_slack_url, send_to_slack, header_block, section_block, fields_block, divider_block, context_block, verdict_emoji
 from ig_metrics import (
-    get_metric_value,
-    get_metric_uplift,
-    get_metric_confidence,
-    get_metric_ci,
+    build_metric_index,
+    lookup_metric,
     get_total_visitors,
     get_total_orders,
     has_cogs_data,
     primary_revenue_metric,
-    get_variation_visitors,
-    get_variation_orders,
     group_metrics_by_segment,
 )
 from ig_helpers import (
@@ -54,24 +55,138 @@ from ig_config import (
     VERDICT_MIN_RUNTIME,
     VERDICT_MIN_ORDERS,
     METRIC_LABELS,
+    CACHE_TTL,
+    SEGMENT_CACHE_TTL,
+    MS_PER_DAY,
 )
 
 
+# ── Command line ─────────────────────────────────────────────────────────
+
+PARSER = argparse.ArgumentParser(
+    description="Plain-English verdict for a single A/B test.",
+)
+PARSER.add_argument("test_id", nargs="?", help="Test ID (omit to pick from active tests)")
+PARSER.add_argument("--slack", metavar="WEBHOOK_URL", help="Send results to a Slack webhook")
+PARSER.add_argument("--no-cache", action="store_true", help="Skip the on-disk response cache")
+
+
+# ── Constants ────────────────────────────────────────────────────────────
+
+# Best-variation ordering: WINNER first, then by p2bb descending
+_VERDICT_PRIORITY = {"WINNER": 0, "KEEP RUNNING": 1, "FLAT": 2, "LOSER": 3, "TOO EARLY": 4}
+
+_by_sort_key = operator.itemgetter("sort_key")
+
+# What to test next, keyed by (test type, verdict)
+_NEXT_TEST_SUGGESTIONS = MappingProxyType({
+    ("Pricing", "WINNER"): (
+        "Try testing a slightly higher price point to find the ceiling. "
+        "Also consider testing price anchoring or bundle pricing."
+    ),
+    ("Pricing", "LOSER"): (
+        "The price change hurt performance. Try a smaller increment, "
+        "or test perceived-value tactics (strikethrough pricing, limited-time framing)."
+    ),
+    ("Pricing", "FLAT"): (
+        "Price didn't matter here. Test something that changes perceived value instead: "
+        "urgency messaging, social proof, or bundle offers."
+    ),
+    ("Shipping", "WINNER"): (
+        "Great — shipping changes moved the needle. Try testing different free-shipping "
+        "thresholds to optimize the balance between conversion lift and margin."
+    ),
+    ("Shipping", "LOSER"): (
+        "This shipping approach hurt. Consider testing free shipping with a "
+        "minimum order threshold, or offering shipping as a value-add at checkout."
+    ),
+    ("Shipping", "FLAT"): (
+        "Shipping wasn't the lever. Test something else — pricing, offer messaging, "
+        "or checkout flow changes."
+    ),
+    ("Offer", "WINNER"): (
+        "The offer works. Now optimize it: test the discount level, "
+        "the qualifying threshold, or the way it's communicated."
+    ),
+    ("Offer", "LOSER"): (
+        "This offer didn't land. Try a different discount structure "
+        "(percentage vs. fixed), or test urgency-based offers."
+    ),
+    ("Offer", "FLAT"): (
+        "The offer didn't move behavior. Test something more visible — "
+        "homepage messaging, product page layout, or the checkout experience."
+    ),
+    ("Content", "WINNER"): (
+        "This content change is working. Double down — test further variations "
+        "of the winning approach on other pages."
+    ),
+    ("Content", "LOSER"): (
+        "This content didn't resonate. Try a completely different angle "
+        "or test on a different page in the funnel."
+    ),
+    ("Content", "FLAT"): (
+        "The messaging change isn't moving the needle. Try a bolder change — "
+        "layout, imagery, or a fundamentally different value proposition."
+    ),
+})
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────
 
 
+_ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+
+
+def _load_api_key() -> str | None:
+    """Read INTELLIGEMS_API_KEY from the environment or the workspace .env.
+
+    Scans the .env next to this script directly — it only needs one key —
+    and falls back to python-dotenv's search when that file doesn't exist.
+    """
+    api_key = os.environ.get("INTELLIGEMS_API_KEY")
+    if api_key:
+        return api_key
+
+    if not os.path.exists(_ENV_PATH):
+        from dotenv import load_dotenv
+        load_dotenv()
+        return os.getenv("INTELLIGEMS_API_KEY")
+
+    api_key = None
+    with open(_ENV_PATH) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("export "):
+                line = line[len("export "):]
+            name, _, value = line.partition("=")
+            if name.strip() != "INTELLIGEMS_API_KEY":
+                continue
+            value = value.strip()
+            if value[:1] in ("'", '"'):
+                api_key = value[1:].split(value[0], 1)[0]
+            else:
+                api_key = value.split(" #", 1)[0].strip()
+    return api_key
+
+
 def compute_runtime_days(experiment: dict) -> int:
     """Calculate runtime days, handling both active and ended tests."""
     ended_at = experiment.get("endedAtTs") or experiment.get("endedAt")
     started_at = experiment.get("startedAtTs") or experiment.get("startedAt")
     if not started_at:
         return 0
-    start = datetime.fromtimestamp(started_at / 1000)
-    if ended_at:
-        end = datetime.fromtimestamp(ended_at / 1000)
-    else:
-        end = datetime.now()
-    return max((end - start).days, 0)
+    if not ended_at:
+        ended_at = time.time() * 1000
+    return max(int((ended_at - started_at) // MS_PER_DAY), 0)
+
+
+def fetch_result(future, log: list):
+    """Wait for a pooled fetch, then print its cache notes on this thread."""
+    try:
+        return future.result()
+    finally:
+        for line in log:
+            print(line)
 
 
 def compute_runtime_display(days: int) -> str:
@@ -102,61 +217,10 @@ def variation_verdict(p2bb: float, uplift: float, days: int) -> str:
 
 def suggest_next_test(test_type: str, verdict: str) -> str:
     """Suggest what to test next based on type and outcome."""
-    suggestions = {
-        ("Pricing", "WINNER"): (
-            "Try testing a slightly higher price point to find the ceiling. "
-            "Also consider testing price anchoring or bundle pricing."
-        ),
-        ("Pricing", "LOSER"): (
-            "The price change hurt performance. Try a smaller increment, "
-            "or test perceived-value tactics (strikethrough pricing, limited-time framing)."
-        ),
-        ("Pricing", "FLAT"): (
-            "Price didn't matter here. Test something that changes perceived value instead: "
-            "urgency messaging, social proof, or bundle offers."
-        ),
-        ("Shipping", "WINNER"): (
-            "Great — shipping changes moved the needle. Try testing different free-shipping "
-            "thresholds to optimize the balance between conversion lift and margin."
-        ),
-        ("Shipping", "LOSER"): (
-            "This shipping approach hurt. Consider testing free shipping with a "
-            "minimum order threshold, or offering shipping as a value-add at checkout."
-        ),
-        ("Shipping", "FLAT"): (
-            "Shipping wasn't the lever. Test something else — pricing, offer messaging, "
-            "or checkout flow changes."
-        ),
-        ("Offer", "WINNER"): (
-            "The offer works. Now optimize it: test the discount level, "
-            "the qualifying threshold, or the way it's communicated."
-        ),
-        ("Offer", "LOSER"): (
-            "This offer didn't land. Try a different discount structure "
-            "(percentage vs. fixed), or test urgency-based offers."
-        ),
-        ("Offer", "FLAT"): (
-            "The offer didn't move behavior. Test something more visible — "
-            "homepage messaging, product page layout, or the checkout experience."
-        ),
-        ("Content", "WINNER"): (
-            "This content change is working. Double down — test further variations "
-            "of the winning approach on other pages."
-        ),
-        ("Content", "LOSER"): (
-            "This content didn't resonate. Try a completely different angle "
-            "or test on a different page in the funnel."
-        ),
-        ("Content", "FLAT"): (
-            "The messaging change isn't moving the needle. Try a bolder change — "
-            "layout, imagery, or a fundamentally different value proposition."
-        ),
-    }
-
     if verdict in ("TOO EARLY", "KEEP RUNNING"):
         return "Just wait. Let the test accumulate more data before planning the next move."
 
-    return suggestions.get(
+    return _NEXT_TEST_SUGGESTIONS.get(
         (test_type, verdict),
         "Consider testing a different lever entirely — pricing, shipping, offers, or content."
     )
@@ -166,53 +230,38 @@ def suggest_next_test(test_type: str, verdict: str) -> str:
 
 
 def main():
-    # Load environment
-    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
-    if os.path.exists(env_path):
-        load_dotenv(env_path)
-    else:
-        load_dotenv()
+    args = PARSER.parse_args()
 
-    api_key = os.getenv("INTELLIGEMS_API_KEY")
+    api_key = _load_api_key()
     if not api_key or api_key == "your_api_key_here":
         print("ERROR: No API key found.")
         print("Set INTELLIGEMS_API_KEY in your .env file.")
         sys.exit(1)
 
     api = IntelligemsAPI(api_key)
-    slack_url = parse_slack_args(sys.argv)
+    slack_url = check_slack_url(args.slack) if args.slack else None
+    use_cache = not args.no_cache
 
     # ── Select test ──────────────────────────────────────────────────
 
-    # Filter out --slack and its value from argv for test ID detection
-    args = []
-    skip_next = False
-    for arg in sys.argv[1:]:
-        if skip_next:
-            skip_next = False
-            continue
-        if arg == "--slack":
-            skip_next = True
-            continue
-        args.append(arg)
-
-    test_id = args[0] if args else None
+    test_id = args.test_id
     if not test_id:
         print("Fetching active experiments...")
-        experiments = api.get_active_experiments()
+        experiments = cached_call(
+            ("active",), CACHE_TTL, api.get_active_experiments, api_key,
+            enabled=use_cache,
+        )
         if not experiments:
             print("No active experiments found.")
             print("To analyze an ended test, pass its ID: python3 verdict.py <test_id>")
             sys.exit(0)
 
-        print(f"\nFound {len(experiments)} active experiment(s):\n")
-        for i, exp in enumerate(experiments, 1):
-            name = exp.get("name", "Unnamed")
-            exp_id = exp.get("id", "?")
-            days = runtime_days(exp.get("startedAtTs") or exp.get("startedAt"))
-            print(f"  {i}. {name}  (ID: {exp_id}, running {days} days)")
-
-        print()
+        picker = "\n".join(
+            f"  {i}. {exp.get('name', 'Unnamed')}  (ID: {exp.get('id', '?')}, "
+            f"running {runtime_days(exp.get('startedAtTs') or exp.get('startedAt'))} days)"
+            for i, exp in enumerate(experiments, 1)
+        )
+        sys.stdout.write(f"\nFound {len(experiments)} active experiment(s):\n\n{picker}\n\n")
         try:
             choice = input("Pick a test number (or paste an ID): ").strip()
         except (EOFError, KeyboardInterrupt):
@@ -230,11 +279,32 @@ def main():
 
     # ── Fetch test data ──────────────────────────────────────────────
 
+    # Detail and overview are independent, so both requests go out now;
+    # the device segment fetch joins them once maturity is known.
+    # Cache notes from the pool threads are collected per fetch and printed
+    # by fetch_result, so they never land mid-line in the progress output.
     print(f"\nFetching test details for {test_id}...")
-    experiment = api.get_experience_detail(test_id)
+    executor = ThreadPoolExecutor(max_workers=3)
+    detail_log, overview_log, segment_log = [], [], []
+    detail_future = executor.submit(
+        cached_call, ("detail", test_id), cache_ttl,
+        lambda: api.get_experience_detail(test_id), api_key, use_cache,
+        detail_log.append,
+    )
+    # A cached overview lives as long as the test's detail allows, so its
+    # TTL waits on the detail fetch (only consulted when a cache file exists)
+    overview_future = executor.submit(
+        cached_call, ("overview", test_id),
+        lambda _: cache_ttl(detail_future.result()),
+        lambda: api.get_overview_analytics(test_id), api_key, use_cache,
+        overview_log.append,
+    )
+
+    experiment = fetch_result(detail_future, detail_log)
     if not experiment or "id" not in experiment:
         print(f"ERROR: Could not find test with ID '{test_id}'.")
         print("Check the ID and try again.")
+        executor.shutdown(wait=False, cancel_futures=True)
         sys.exit(1)
 
     test_name = experiment.get("name", "Unnamed Test")
@@ -245,22 +315,25 @@ def main():
 
     if not control:
         print("ERROR: No control variation found in this test.")
+        executor.shutdown(wait=False, cancel_futures=True)
         sys.exit(1)
 
     if not variants:
         print("ERROR: No non-control variations found in this test.")
+        executor.shutdown(wait=False, cancel_futures=True)
         sys.exit(1)
 
     days = compute_runtime_days(experiment)
     days_display = compute_runtime_display(days)
 
     print("Fetching analytics...")
-    analytics = api.get_overview_analytics(test_id)
+    analytics = fetch_result(overview_future, overview_log)
     metrics = analytics.get("metrics", [])
 
     if not metrics:
         print("ERROR: No analytics data returned for this test.")
         print("The test may not have collected any data yet.")
+        executor.shutdown(wait=False, cancel_futures=True)
         sys.exit(1)
 
     total_visitors = get_total_visitors(metrics)
@@ -287,66 +360,39 @@ def main():
 
     is_too_early = len(maturity_issues) > 0
 
+    # Segment data only depends on the test ID, so fetch it while the
+    # variations are analyzed; it's skipped entirely for TOO EARLY tests.
+    segment_future = None
+    if not is_too_early:
+        segment_future = executor.submit(
+            cached_call, ("segment", test_id, "device_type"),
+            cache_ttl(experiment, SEGMENT_CACHE_TTL),
+            lambda: api.get_segment_analytics(test_id, "device_type"), api_key, use_cache,
+            segment_log.append,
+        )
+    executor.shutdown(wait=False)
+
     # ── Analyze each variation ───────────────────────────────────────
 
     variation_results = []
 
+    # One pass over the metrics rows; every lookup below is then O(1)
+    metric_index = build_metric_index(metrics)
+    control_value = lookup_metric(metric_index, primary_metric, control["id"], "value")
+
     for variant in variants:
         vid = variant["id"]
         vname = get_variation_name(variations, vid)
 
-        p2bb = get_metric_confidence(metrics, primary_metric, vid)
-        uplift = get_metric_uplift(metrics, primary_metric, vid)
-        ci_low, ci_high = get_metric_ci(metrics, primary_metric, vid)
-        primary_value = get_metric_value(metrics, primary_metric, vid)
-        control_value = get_metric_value(metrics, primary_metric, control["id"])
+        primary = metric_index.get((primary_metric, vid), {})
+        p2bb = primary.get("confidence")
+        uplift = primary.get("uplift")
+        ci_low, ci_high = primary.get("ci_low"), primary.get("ci_high")
+        primary_value = primary.get("value")
 
         # Revenue vs conversion comparison
-        rpv_uplift = get_metric_uplift(metrics, "net_revenue_per_visitor", vid)
-        cr_uplift = get_metric_uplift(metrics, "conversion_rate", vid)
-
-        # Determine divergence
-        divergence = None
-        if rpv_uplift is not None and cr_uplift is not None:
-            rpv_dir = "up" if rpv_uplift > 0.005 else ("down" if rpv_uplift < -0.005 else "flat")
-            cr_dir = "up" if cr_uplift > 0.005 else ("down" if cr_uplift < -0.005 else "flat")
-
-            if rpv_dir != cr_dir and rpv_dir != "flat" and cr_dir != "flat":
-                if rpv_dir == "up" and cr_dir == "down":
-                    divergence = (
-                        "Revenue is UP but conversion is DOWN — fewer people are buying, "
-                        "but those who do spend more. Worth monitoring."
-                    )
-                elif rpv_dir == "down" and cr_dir == "up":
-                    divergence = (
-                        "Conversion is UP but revenue is DOWN — more people are buying, "
-                        "but they're spending less per order. Check if discounting is too aggressive."
-                    )
-                else:
-                    divergence = (
-                        f"Revenue per visitor is {rpv_dir} ({fmt_lift(rpv_uplift)}) "
-                        f"while conversion rate is {cr_dir} ({fmt_lift(cr_uplift)}). "
-                        "These signals don't fully align — investigate further."
-                    )
-
-        # GPV vs RPV comparison (when COGS data exists)
-        profit_note = None
-        if cogs:
-            gpv_uplift = get_metric_uplift(metrics, "gross_profit_per_visitor", vid)
-            rpv_uplift_check = get_metric_uplift(metrics, "net_revenue_per_visitor", vid)
-            if gpv_uplift is not None and rpv_uplift_check is not None:
-                gpv_dir = gpv_uplift > 0
-                rpv_dir_bool = rpv_uplift_check > 0
-                if gpv_dir != rpv_dir_bool:
-                    profit_note = (
-                        f"Revenue ({fmt_lift(rpv_uplift_check)}) and profit ({fmt_lift(gpv_uplift)}) "
-                        "are moving in opposite directions. COGS are eating into the gains."
-                    )
-                else:
-                    profit_note = (
-                        f"Revenue ({fmt_lift(rpv_uplift_check)}) and profit ({fmt_lift(gpv_uplift)}) "
-                        "are aligned. COGS aren't distorting the picture."
-                    )
+        rpv_uplift = lookup_metric(metric_index, "net_revenue_per_visitor", vid, "uplift")
+        cr_uplift = lookup_metric(metric_index, "conversion_rate", vid, "uplift")
 
         # Verdict
         if is_too_early:
@@ -354,14 +400,6 @@ def main():
         else:
             v_verdict = variation_verdict(p2bb, uplift, days)
 
-        # Reasoning
-        reasoning = build_reasoning(
-            v_verdict, vname, primary_label, uplift, p2bb, days, total_orders
-        )
-
-        # Risk framing
-        risk = build_risk(p2bb, ci_low, ci_high, primary_label, profit_note)
-
         variation_results.append({
             "id": vid,
             "name": vname,
@@ -374,35 +412,43 @@ def main():
             "control_value": control_value,
             "rpv_uplift": rpv_uplift,
             "cr_uplift": cr_uplift,
-            "divergence": divergence,
-            "profit_note": profit_note,
-            "reasoning": reasoning,
-            "risk": risk,
+            "sort_key": (_VERDICT_PRIORITY.get(v_verdict, 5), -(p2bb or 0)),
         })
 
     # ── Pick the best variation ──────────────────────────────────────
 
-    # Sort: WINNER first, then by p2bb descending
-    verdict_priority = {"WINNER": 0, "KEEP RUNNING": 1, "FLAT": 2, "LOSER": 3, "TOO EARLY": 4}
-    variation_results.sort(
-        key=lambda r: (verdict_priority.get(r["verdict"], 5), -(r["p2bb"] or 0))
-    )
+    variation_results.sort(key=_by_sort_key)
     best = variation_results[0]
 
+    # The narrative sections (divergence, risk, reasoning) are only shown for
+    # the best variation, so they're built once here rather than per variant
+    profit_note = None
+    if cogs:
+        gpv_uplift = lookup_metric(metric_index, "gross_profit_per_visitor", best["id"], "uplift")
+        profit_note = build_profit_note(best["rpv_uplift"], gpv_uplift)
+    best["divergence"] = build_divergence(best["rpv_uplift"], best["cr_uplift"])
+    best["profit_note"] = profit_note
+    best["reasoning"] = build_reasoning(
+        best["verdict"], best["name"], primary_label, best["uplift"], best["p2bb"],
+        days, total_orders,
+    )
+    best["risk"] = build_risk(best["p2bb"], best["ci_low"], best["ci_high"], primary_label, profit_note)
+
     # ── Segment quick-check ──────────────────────────────────────────
 
     segment_results = []
     if not is_too_early:
         print("Checking segments (device type)...")
         try:
-            seg_data = api.get_segment_analytics(test_id, "device_type")
+            seg_data = fetch_result(segment_future, segment_log)
             seg_metrics = seg_data.get("metrics", [])
             if seg_metrics:
                 grouped = group_metrics_by_segment(seg_metrics)
                 for seg_name, seg_m in grouped.items():
-                    seg_p2bb = get_metric_confidence(seg_m, primary_metric, best["id"])
-                    seg_uplift = get_metric_uplift(seg_m, primary_metric, best["id"])
-                    seg_visitors = get_variation_visitors(seg_m, best["id"])
+                    seg_index = build_metric_index(seg_m, names=(primary_metric, "n_visitors"))
+                    seg_p2bb = lookup_metric(seg_index, primary_metric, best["id"], "confidence")
+                    seg_uplift = lookup_metric(seg_index, primary_metric, best["id"], "uplift")
+                    seg_visitors = int(lookup_metric(seg_index, "n_visitors", best["id"], "value") or 0)
 
                     if seg_uplift is not None:
                         seg_verdict = variation_verdict(seg_p2bb, seg_uplift, days)
@@ -455,95 +501,99 @@ def main():
 
     if not slack_url:
         # ── Terminal output ───────────────────────────────────────
-        print("\n" + "=" * 60)
-        print("=== TEST VERDICT ===")
-        print("=" * 60)
-        print(f"Test: {test_name}")
-        print(f"Type: {test_type}")
-        print(f"Runtime: {days_display} | Visitors: {fmt_number(total_visitors)} | Orders: {fmt_number(total_orders)}")
+        out = []
+        add = out.append
+
+        add("\n" + "=" * 60)
+        add("=== TEST VERDICT ===")
+        add("=" * 60)
+        add(f"Test: {test_name}")
+        add(f"Type: {test_type}")
+        add(f"Runtime: {days_display} | Visitors: {fmt_number(total_visitors)} | Orders: {fmt_number(total_orders)}")
         if cogs:
-            print(f"Primary Metric: {primary_label} (COGS data available)")
+            add(f"Primary Metric: {primary_label} (COGS data available)")
         else:
-            print(f"Primary Metric: {primary_label}")
-        print()
+            add(f"Primary Metric: {primary_label}")
+        add("")
 
         # Maturity warnings
         if is_too_early:
-            print("VERDICT: TOO EARLY")
-            print()
-            print("Maturity issues:")
+            add("VERDICT: TOO EARLY")
+            add("")
+            add("Maturity issues:")
             for issue in maturity_issues:
-                print(f"  - {issue}")
-            print()
+                add(f"  - {issue}")
+            add("")
 
         # Per-variation results
         for i, result in enumerate(variation_results):
             if len(variation_results) > 1:
                 marker = " << BEST" if i == 0 else ""
-                print(f"--- Variation: {result['name']}{marker} ---")
+                add(f"--- Variation: {result['name']}{marker} ---")
             else:
-                print(f"--- Variation: {result['name']} ---")
+                add(f"--- Variation: {result['name']} ---")
 
             if not is_too_early:
-                print(f"VERDICT: {result['verdict']}")
+                add(f"VERDICT: {result['verdict']}")
 
-            print(f"{primary_label}: {fmt_lift(result['uplift'])}")
-            print(f"Confidence: {fmt_confidence(result['p2bb'])}")
+            add(f"{primary_label}: {fmt_lift(result['uplift'])}")
+            add(f"Confidence: {fmt_confidence(result['p2bb'])}")
 
             if result['ci_low'] is not None and result['ci_high'] is not None:
-                print(f"CI Range: {fmt_lift(result['ci_low'])} to {fmt_lift(result['ci_high'])}")
+                add(f"CI Range: {fmt_lift(result['ci_low'])} to {fmt_lift(result['ci_high'])}")
 
             if result['rpv_uplift'] is not None:
-                print(f"RPV Lift: {fmt_lift(result['rpv_uplift'])}")
+                add(f"RPV Lift: {fmt_lift(result['rpv_uplift'])}")
             if result['cr_uplift'] is not None:
-                print(f"CR Lift: {fmt_lift(result['cr_uplift'])}")
+                add(f"CR Lift: {fmt_lift(result['cr_uplift'])}")
 
-            print()
+            add("")
 
         # Reasoning (for the best variation)
-        print("--- Reasoning ---")
-        print(best["reasoning"])
-        print()
+        add("--- Reasoning ---")
+        add(best["reasoning"])
+        add("")
 
         # Risk assessment
-        print("--- Risk Assessment ---")
-        print(best["risk"])
-        print()
+        add("--- Risk Assessment ---")
+        add(best["risk"])
+        add("")
 
         # Revenue vs conversion
-        print("--- Revenue vs Conversion ---")
+        add("--- Revenue vs Conversion ---")
         if best["divergence"]:
-            print(best["divergence"])
+            add(best["divergence"])
         else:
-            print("Aligned — revenue and conversion are moving in the same direction.")
-        print()
+            add("Aligned — revenue and conversion are moving in the same direction.")
+        add("")
 
         # Segment check
-        print("--- Segment Check (Device) ---")
+        add("--- Segment Check (Device) ---")
         if not segment_results:
             if is_too_early:
-                print("Skipped — not enough data for segment analysis yet.")
+                add("Skipped — not enough data for segment analysis yet.")
             else:
-                print("No segment data available.")
+                add("No segment data available.")
         else:
             for seg in segment_results:
                 if seg.get("error"):
-                    print(f"  {seg['segment']}: Error fetching data — {seg['error']}")
+                    add(f"  {seg['segment']}: Error fetching data — {seg['error']}")
                     continue
                 flag = " *** CONTRADICTION ***" if seg["contradiction"] else ""
                 visitors_str = f" ({fmt_number(seg['visitors'])} visitors)" if seg["visitors"] else ""
-                print(
+                add(
                     f"  {seg['segment']}: {seg['verdict']} "
                     f"({fmt_lift(seg['uplift'])}, {fmt_confidence(seg['p2bb'])} conf)"
                     f"{visitors_str}{flag}"
                 )
-        print()
+        add("")
 
         # What to test next
-        print("--- What to Test Next ---")
-        print(next_test)
-        print()
-        print("=" * 60)
+        add("--- What to Test Next ---")
+        add(next_test)
+        add("")
+        add("=" * 60)
+        sys.stdout.write("\n".join(out) + "\n")
 
     else:
         # ── Slack output ──────────────────────────────────────────
@@ -648,15 +698,15 @@ def build_reasoning(
     total_orders: int,
 ) -> str:
     """Build a plain-English explanation of the verdict."""
-    lift_str = fmt_lift(uplift)
-    conf_str = fmt_confidence(p2bb)
-
     if verdict == "TOO EARLY":
         parts = [f'"{variation_name}" has been running for {days} day(s) with {fmt_number(total_orders)} orders.']
         parts.append("There isn't enough data yet to make any call.")
         parts.append("Let it run longer before drawing conclusions.")
         return " ".join(parts)
 
+    lift_str = fmt_lift(uplift)
+    conf_str = fmt_confidence(p2bb)
+
     if verdict == "WINNER":
         return (
             f'"{variation_name}" is beating control by {lift_str} on {metric_label}, '
@@ -687,6 +737,50 @@ def build_reasoning(
     )
 
 
+def build_divergence(rpv_uplift: float | None, cr_uplift: float | None) -> str | None:
+    """Explain revenue and conversion moving in opposite directions, if they are."""
+    if rpv_uplift is None or cr_uplift is None:
+        return None
+
+    rpv_dir = "up" if rpv_uplift > 0.005 else ("down" if rpv_uplift < -0.005 else "flat")
+    cr_dir = "up" if cr_uplift > 0.005 else ("down" if cr_uplift < -0.005 else "flat")
+
+    if rpv_dir == cr_dir or rpv_dir == "flat" or cr_dir == "flat":
+        return None
+
+    if rpv_dir == "up" and cr_dir == "down":
+        return (
+            "Revenue is UP but conversion is DOWN — fewer people are buying, "
+            "but those who do spend more. Worth monitoring."
+        )
+    if rpv_dir == "down" and cr_dir == "up":
+        return (
+            "Conversion is UP but revenue is DOWN — more people are buying, "
+            "but they're spending less per order. Check if discounting is too aggressive."
+        )
+    return (
+        f"Revenue per visitor is {rpv_dir} ({fmt_lift(rpv_uplift)}) "
+        f"while conversion rate is {cr_dir} ({fmt_lift(cr_uplift)}). "
+        "These signals don't fully align — investigate further."
+    )
+
+
+def build_profit_note(rpv_uplift: float | None, gpv_uplift: float | None) -> str | None:
+    """Compare revenue and profit lift (GPV vs RPV) when COGS data exists."""
+    if gpv_uplift is None or rpv_uplift is None:
+        return None
+
+    if (gpv_uplift > 0) != (rpv_uplift > 0):
+        return (
+            f"Revenue ({fmt_lift(rpv_uplift)}) and profit ({fmt_lift(gpv_uplift)}) "
+            "are moving in opposite directions. COGS are eating into the gains."
+        )
+    return (
+        f"Revenue ({fmt_lift(rpv_uplift)}) and profit ({fmt_lift(gpv_uplift)}) "
+        "are aligned. COGS aren't distorting the picture."
+    )
+
+
 def build_risk(
     p2bb: float | None,
     ci_low: float | None,